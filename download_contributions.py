@@ -5,11 +5,13 @@ Download contribution ZIP files from scraped consultation data
 import json
 import csv
 import os
+import re
 import asyncio
 import aiohttp
+from operator import itemgetter
 from pathlib import Path
 import logging
-from typing import List, Dict
+from typing import Callable, Iterable, Optional, Tuple
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,108 +19,192 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Size of the window used when streaming response bodies to disk
+CHUNK_SIZE = 64 * 1024
+
+# Characters dropped from initiative names when building filenames
+# (\w covers the same characters as str.isalnum, plus '_')
+_UNSAFE_FILENAME_CHARS = re.compile(r'[^\w \-]')
+
+# Columns read from each scraped record, in the order records are unpacked
+RECORD_FIELDS = (
+    'initiative_id',
+    'initiative_name',
+    'has_contributions_zip',
+    'contributions_zip_url',
+    'has_documents_annexed',
+    'documents_annexed_url',
+    'has_summary_report',
+    'summary_report_url',
+)
+
+
+def _csv_flag(value: str) -> bool:
+    """Parse a boolean column written by csv.DictWriter ('True'/'False')"""
+    return value == 'True'
+
 
 class ContributionDownloader:
     """Download contribution files from scraped data"""
 
-    def __init__(self, output_dir: str = "contributions"):
+    def __init__(self, output_dir: str = "contributions", concurrency: int = 8):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.concurrency = concurrency
+        # Bounds the number of downloads in flight at any time
+        self.semaphore = asyncio.Semaphore(concurrency)
 
     async def download_file(self, session: aiohttp.ClientSession, url: str, filename: str) -> bool:
-        """Download a single file"""
+        """Download a single file, resuming a partial download if one exists"""
         filepath = self.output_dir / filename
 
         if filepath.exists():
             logger.info(f"File already exists: {filename}")
             return True
 
+        # Downloads stream to a .part file so an interrupted download is never
+        # mistaken for a finished one; the .validator file keeps the ETag or
+        # Last-Modified of the response the partial bytes came from
+        part_path = filepath.with_name(filepath.name + '.part')
+        validator_path = filepath.with_name(filepath.name + '.validator')
+
+        headers = {}
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        if offset and validator_path.exists():
+            # If-Range makes the server send the whole file (200) instead of
+            # the remainder (206) when it changed since the partial download
+            headers['Range'] = f'bytes={offset}-'
+            headers['If-Range'] = validator_path.read_text()
+
         try:
-            logger.info(f"Downloading: {filename}")
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=300)) as response:
-                if response.status == 200:
-                    content = await response.read()
-                    with open(filepath, 'wb') as f:
-                        f.write(content)
-                    logger.info(f"Successfully downloaded: {filename} ({len(content)} bytes)")
+            async with self.semaphore:
+                logger.info(f"Downloading: {filename}")
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=300)) as response:
+                    if response.status == 206:
+                        logger.info(f"Resuming {filename} from byte {offset}")
+                        mode = 'ab'
+                    elif response.status == 200:
+                        offset = 0
+                        mode = 'wb'
+                        validator = self._get_validator(response)
+                        if validator:
+                            validator_path.write_text(validator)
+                        else:
+                            validator_path.unlink(missing_ok=True)
+                    elif response.status == 416 and 'Range' in headers:
+                        # Nothing left to fetch: the partial file is complete
+                        mode = None
+                    else:
+                        logger.error(f"Failed to download {filename}: HTTP {response.status}")
+                        return False
+
+                    size = offset
+                    if mode:
+                        with open(part_path, mode) as f:
+                            async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                                f.write(chunk)
+                                size += len(chunk)
+
+                    part_path.replace(filepath)
+                    validator_path.unlink(missing_ok=True)
+                    logger.info(f"Successfully downloaded: {filename} ({size} bytes)")
                     return True
-                else:
-                    logger.error(f"Failed to download {filename}: HTTP {response.status}")
-                    return False
         except Exception as e:
             logger.error(f"Error downloading {filename}: {e}")
             return False
 
+    @staticmethod
+    def _get_validator(response: aiohttp.ClientResponse) -> Optional[str]:
+        """Return a validator usable in If-Range (strong ETag or Last-Modified)"""
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return response.headers.get('Last-Modified')
+
     async def download_from_json(self, json_file: str):
         """Download contributions from JSON results file"""
 
         with open(json_file, 'r') as f:
             data = json.load(f)
 
-        await self._download_from_data(data)
+        # One multi-key lookup per record instead of a .get call per field.
+        # Scraper output carries every field; anything else falls back to
+        # .get so missing fields read as None
+        try:
+            records = list(map(itemgetter(*RECORD_FIELDS), data))
+        except KeyError:
+            records = [tuple(map(record.get, RECORD_FIELDS)) for record in data]
+        await self._download_from_data(records)
 
     async def download_from_csv(self, csv_file: str):
         """Download contributions from CSV results file"""
 
-        data = []
-        with open(csv_file, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            data = list(reader)
-
-        await self._download_from_data(data)
-
-    async def _download_from_data(self, data: List[Dict]):
-        """Download contributions from parsed data"""
+        # Feed rows straight from the reader; records are only needed once
+        with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                logger.error(f"{csv_file} is empty")
+                return
+            missing = [field for field in RECORD_FIELDS if field not in header]
+            if missing:
+                logger.error(f"{csv_file} is missing columns: {', '.join(missing)}")
+                return
+            columns = [header.index(field) for field in RECORD_FIELDS]
+            # Like csv.DictReader, skip blank lines and read missing trailing
+            # fields of short rows as None
+            width = max(columns) + 1
+            rows = (row if len(row) >= width else row + [None] * (width - len(row))
+                    for row in reader if row)
+            records = map(itemgetter(*columns), rows)
+            await self._download_from_data(records, is_true=_csv_flag)
+
+    async def _download_from_data(self, records: Iterable[Tuple], is_true: Callable[[object], bool] = bool):
+        """Download contributions from records laid out as RECORD_FIELDS"""
+
+        # is_true parses the has_* flags for the source format:
+        # JSON already holds booleans, CSV callers pass _csv_flag
 
         # Collect all download tasks
         download_tasks = []
 
-        async with aiohttp.ClientSession() as session:
-            for idx, record in enumerate(data, 1):
-                initiative_id = record.get('initiative_id', f'unknown_{idx}')
-                initiative_name = record.get('initiative_name', 'Unknown')
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            for idx, record in enumerate(records, 1):
+                (initiative_id, initiative_name,
+                 has_contributions, contributions_url,
+                 has_documents, documents_url,
+                 has_summary, summary_url) = record
+
+                has_contributions = is_true(has_contributions)
+                has_documents = is_true(has_documents)
+                has_summary = is_true(has_summary)
+
+                # Records without any published file are skipped before any
+                # filename work
+                if not (has_contributions or has_documents or has_summary):
+                    continue
+
+                initiative_id = initiative_id or f'unknown_{idx}'
+                initiative_name = initiative_name or 'Unknown'
 
                 # Clean filename
-                safe_name = "".join(c for c in initiative_name if c.isalnum() or c in (' ', '-', '_')).strip()
+                safe_name = _UNSAFE_FILENAME_CHARS.sub('', initiative_name).strip()
                 safe_name = safe_name[:50]  # Limit length
 
                 # Download contributions ZIP
-                contributions_url = record.get('contributions_zip_url')
-                has_contributions = record.get('has_contributions_zip')
-
-                # Handle boolean from CSV (string 'True'/'False')
-                if isinstance(has_contributions, str):
-                    has_contributions = has_contributions.lower() == 'true'
-
                 if has_contributions and contributions_url and contributions_url.lower() != 'none':
                     filename = f"{initiative_id}_{safe_name}_contributions.zip"
                     task = self.download_file(session, contributions_url, filename)
                     download_tasks.append(task)
 
-                    # Add small delay between requests
-                    await asyncio.sleep(0.5)
-
                 # Download documents annexed
-                documents_url = record.get('documents_annexed_url')
-                has_documents = record.get('has_documents_annexed')
-
-                if isinstance(has_documents, str):
-                    has_documents = has_documents.lower() == 'true'
-
                 if has_documents and documents_url and documents_url.lower() != 'none':
                     filename = f"{initiative_id}_{safe_name}_documents.zip"
                     task = self.download_file(session, documents_url, filename)
                     download_tasks.append(task)
 
-                    await asyncio.sleep(0.5)
-
                 # Download summary reports
-                summary_url = record.get('summary_report_url')
-                has_summary = record.get('has_summary_report')
-
-                if isinstance(has_summary, str):
-                    has_summary = has_summary.lower() == 'true'
-
                 if has_summary and summary_url and summary_url.lower() != 'none':
                     # Determine file extension from URL or default to PDF
                     ext = 'pdf'
@@ -129,8 +215,6 @@ class ContributionDownloader:
                     task = self.download_file(session, summary_url, filename)
                     download_tasks.append(task)
 
-                    await asyncio.sleep(0.5)
-
             # Execute all downloads
             if download_tasks:
                 logger.info(f"Starting download of {len(download_tasks)} files")
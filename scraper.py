@@ -6,13 +6,31 @@ Scrapes consultation data from the EU Better Regulation portal
 import asyncio
 import csv
 import json
+import os
 import re
-from datetime import datetime
-from typing import Dict, List, Optional
-from playwright.async_api import async_playwright, Page, Browser
-from dataclasses import dataclass, asdict
+import sqlite3
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
+import aiohttp
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Route
+from dataclasses import dataclass, fields
 import logging
 
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stdlib json writes the same output
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:  # Optional faster event loop; not available on Windows
+    uvloop = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -21,7 +39,29 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+
+def _loads(data):
+    """Parse JSON from str or bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Patterns used for every initiative, compiled once
+_INITIATIVE_ID_RE = re.compile(r'/initiatives/(\d+)')
+_FEEDBACK_NUM_RE = re.compile(r':\s*(\d+)')
+_INITIATIVE_HREF_RE = re.compile(r'href="([^"]*/initiatives/\d+[^"]*)"')
+_WORD_START_RE = re.compile(r'(?<!\S)([^\w\s]*)(\w)')
+_NEXT_PAGE_RE = re.compile(r'ecl-pagination__link--next|aria-label="[^"]*next', re.IGNORECASE)
+
+
+@dataclass(slots=True)
 class ConsultationData:
     """Data structure for consultation information"""
     initiative_id: str
@@ -42,6 +82,200 @@ class ConsultationData:
     error_message: Optional[str]
 
 
+# Field names in declaration order, used for output rows and the CSV header
+_FIELDS = tuple(f.name for f in fields(ConsultationData))
+
+
+def _row(data: ConsultationData) -> Dict:
+    """Return a record as a dict; all fields are scalars, so unlike asdict no deep copy is needed"""
+    return {name: getattr(data, name) for name in _FIELDS}
+
+
+def _css_capitalize(text: str) -> str:
+    """Uppercase the first letter of every word, like CSS text-transform: capitalize"""
+    return _WORD_START_RE.sub(lambda m: m.group(1) + m.group(2).upper(), text)
+
+
+class ConsultationPageParser(HTMLParser):
+    """Read the fields PAGE_DATA_SCRIPT extracts from server-rendered HTML
+
+    Mirrors the browser-side selection rules so both paths produce the same
+    page data; text is whitespace-normalized the way innerText renders it.
+    """
+
+    VOID_ELEMENTS = frozenset({
+        'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+        'link', 'meta', 'source', 'track', 'wbr',
+    })
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title: Optional[str] = None  # First h1 / page header title
+        self.topic: Optional[str] = None
+        self.period: Optional[str] = None
+        self.feedback_text: Optional[str] = None
+        self.h3_texts: List[str] = []
+        self.files: List[Dict] = []
+        self._stack: List[str] = []
+        self._captures: List[list] = []  # [kind, depth, text parts]
+        self._topic_term_seen = False
+        self._topic_pending = False
+        self._topic_parent_depth = 0
+        self._file_depth: Optional[int] = None
+
+    @classmethod
+    def parse(cls, html: str) -> 'ConsultationPageParser':
+        parser = cls()
+        parser.feed(html)
+        parser.close()
+        return parser
+
+    def is_complete(self) -> bool:
+        """True if every part PAGE_DATA_SCRIPT reads is in the HTML
+
+        A client-side shell or partly rendered page can still contain stray
+        headings, so the topic and feedback count must both be present, plus
+        the file entries when the page has an outcome section.
+        """
+        if self.topic is None or self.feedback_text is None:
+            return False
+        page_data = self.page_data()
+        has_outcome = page_data['has_summary_section'] or page_data['has_contributions_section']
+        return bool(self.files) or not has_outcome
+
+    def page_data(self) -> Dict:
+        """Return the same structure as PAGE_DATA_SCRIPT"""
+        return {
+            'topic': self.topic,
+            'period': self.period,
+            'feedback_text': self.feedback_text,
+            'has_summary_section': 'Summary report' in self.h3_texts,
+            'has_contributions_section': 'Contributions to the consultation' in self.h3_texts,
+            'files': self.files,
+        }
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.VOID_ELEMENTS:
+            return
+        # A dt or dd start implicitly closes an open dt or dd of the same list
+        if tag in ('dt', 'dd'):
+            for open_tag in reversed(self._stack):
+                if open_tag in ('dt', 'dd'):
+                    self.handle_endtag(open_tag)
+                    break
+                if open_tag == 'dl':
+                    break
+        attributes = dict(attrs)
+        classes = (attributes.get('class') or '').split()
+        self._stack.append(tag)
+        depth = len(self._stack)
+
+        # The element right after the first topic term holds the topic
+        if self._topic_pending:
+            self._topic_pending = False
+            self._capture('topic', depth)
+
+        if self.title is None and (tag == 'h1' or 'ecl-page-header__title' in classes):
+            self._capture('title', depth)
+        if tag == 'dt' and 'ecl-description-list__term' in classes:
+            self._capture('term', depth)
+        if tag == 'span' and 'ecl-u-type-capitalize' in classes and self.period is None:
+            self._capture('period', depth)
+        if tag == 'h4':
+            self._capture('h4', depth)
+        if tag == 'h3':
+            self._capture('h3', depth)
+
+        if tag == 'ecl-file':
+            self.files.append({'index': len(self.files), 'title': '', 'href': None})
+            self._file_depth = depth
+        elif self._file_depth is not None:
+            current = self.files[-1]
+            if 'ecl-file__title' in classes and not current['title']:
+                self._capture('file_title', depth)
+            if tag == 'a' and current['href'] is None:
+                current['href'] = attributes.get('href') or ''
+
+    def handle_endtag(self, tag):
+        if tag not in self._stack:
+            return
+        # Pop up to the matching tag; anything above it was closed implicitly
+        while self._stack.pop() != tag:
+            pass
+        depth = len(self._stack)
+
+        # The topic term was the last child of its parent: there is no topic
+        if self._topic_pending and depth < self._topic_parent_depth:
+            self._topic_pending = False
+
+        while self._captures and self._captures[-1][1] > depth:
+            kind, _, parts = self._captures.pop()
+            self._finish(kind, ' '.join(''.join(parts).split()))
+
+        if self._file_depth is not None and self._file_depth > depth:
+            self._file_depth = None
+
+    def handle_data(self, data):
+        for capture in self._captures:
+            capture[2].append(data)
+
+    def _capture(self, kind: str, depth: int):
+        self._captures.append([kind, depth, []])
+
+    def _finish(self, kind: str, text: str):
+        if kind == 'title':
+            if self.title is None:
+                self.title = text
+        elif kind == 'term':
+            if not self._topic_term_seen and 'topic' in text.lower():
+                self._topic_term_seen = True
+                self._topic_pending = True
+                self._topic_parent_depth = len(self._stack)
+        elif kind == 'topic':
+            self.topic = text or None
+        elif kind == 'period':
+            if self.period is None:
+                self.period = _css_capitalize(text)
+        elif kind == 'h4':
+            lowered = text.lower()
+            if self.feedback_text is None and 'feedback' in lowered and 'received' in lowered:
+                self.feedback_text = text
+        elif kind == 'h3':
+            self.h3_texts.append(text)
+        elif kind == 'file_title':
+            self.files[-1]['title'] = text
+
+
+class RateLimiter:
+    """Token bucket shared by all workers: at most `rate` requests per second on average
+
+    Up to `rate` requests (at least one) may start back to back after an
+    idle period; after that, callers wait for tokens to refill.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        # The bucket must hold a whole token, or rates below 1/s never admit a request
+        self.capacity = max(rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
 class EUConsultationScraper:
     """Scraper for EU public consultations"""
 
@@ -52,87 +286,462 @@ class EUConsultationScraper:
         "&feedbackOpenDateFrom=01-01-2025&feedbackOpenDateClosedBy=31-12-2025"
     )
 
-    def __init__(self, headless: bool = True, slow_mo: int = 500):
+    # Output files are named <prefix>_<timestamp>.csv/.json
+    OUTPUT_PREFIX = 'eu_consultations_2025'
+    # Each scraper keeps its own cache, as their records have different fields
+    CACHE_PATH = f'{OUTPUT_PREFIX}_cache.sqlite'
+
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+    # Chromium flags that cut memory and startup cost; the scraper needs no
+    # GPU, extensions or images
+    CHROMIUM_ARGS = [
+        '--disable-gpu',
+        '--disable-dev-shm-usage',
+        '--disable-accelerated-2d-canvas',
+        '--disable-webgl',
+        '--no-first-run',
+        '--disable-extensions',
+        '--blink-settings=imagesEnabled=false',
+    ]
+    # Added only with no_sandbox, for containers where the sandbox cannot start
+    NO_SANDBOX_ARGS = ['--no-zygote']
+
+    # Consecutive pages that needed the browser before the plain HTTP path is skipped
+    HTTP_MISS_LIMIT = 10
+
+    # Initiative links on the search results page
+    INITIATIVE_LINK_SELECTOR = 'a[href*="/initiatives/"]'
+
+    # Requests the scraper never needs. Stylesheets are kept on purpose:
+    # innerText depends on CSS (text-transform, display)
+    BLOCKED_RESOURCE_TYPES = frozenset({'image', 'font', 'media'})
+    BLOCKED_HOSTS = frozenset({'webanalytics.europa.eu'})
+
+    # Reads everything extract_consultation_data needs in one round-trip
+    # (href is null for files without a link)
+    PAGE_DATA_SCRIPT = """
+        () => {
+            const text = (el) => (el?.innerText || '').trim();
+            const topicTerm = Array.from(document.querySelectorAll('dt.ecl-description-list__term'))
+                .find(dt => dt.innerText.toLowerCase().includes('topic'));
+            const periodElement = document.querySelector('span.ecl-u-type-capitalize');
+            const feedbackHeading = Array.from(document.querySelectorAll('h4'))
+                .find(h4 => {
+                    const heading = h4.innerText.toLowerCase();
+                    return heading.includes('feedback') && heading.includes('received');
+                });
+            // h3 headings tell which outcome sections the page has
+            const sections = new Set(Array.from(document.querySelectorAll('h3')).map(text));
+            return {
+                topic: topicTerm ? text(topicTerm.nextElementSibling) || null : null,
+                period: periodElement ? text(periodElement) : null,
+                feedback_text: feedbackHeading ? feedbackHeading.innerText : null,
+                has_summary_section: sections.has('Summary report'),
+                has_contributions_section: sections.has('Contributions to the consultation'),
+                files: Array.from(document.querySelectorAll('ecl-file')).map((file, index) => {
+                    const link = file.querySelector('a');
+                    return {
+                        index,
+                        title: text(file.querySelector('.ecl-file__title')),
+                        href: link ? (link.getAttribute('href') || '') : null,
+                    };
+                }),
+            };
+        }
+    """
+
+    # True once everything PAGE_DATA_SCRIPT reads is rendered: the description
+    # list, the feedback heading and, if the page has an outcome section, its files
+    PAGE_READY_SCRIPT = """
+        () => {
+            if (!document.querySelector('dt.ecl-description-list__term')) return false;
+            const feedbackHeading = Array.from(document.querySelectorAll('h4'))
+                .find(h4 => {
+                    const heading = h4.innerText.toLowerCase();
+                    return heading.includes('feedback') && heading.includes('received');
+                });
+            if (!feedbackHeading) return false;
+            const sections = Array.from(document.querySelectorAll('h3'), h3 => (h3.innerText || '').trim());
+            const hasOutcome = sections.includes('Summary report')
+                || sections.includes('Contributions to the consultation');
+            return !hasOutcome || document.querySelector('ecl-file') !== null;
+        }
+    """
+
+    def __init__(self, headless: bool = True, slow_mo: int = 0, concurrency: int = 8,
+                 cache_path: Optional[str] = None,
+                 cache_max_age: timedelta = timedelta(days=7), requests_per_second: float = 5,
+                 context_recycle_every: int = 50, no_sandbox: bool = False):
         self.headless = headless
         self.slow_mo = slow_mo
-        self.results: List[ConsultationData] = []
+        # The Chromium sandbox stays on unless explicitly disabled (e.g. in a container)
+        self.no_sandbox = no_sandbox
+        self.concurrency = concurrency  # Number of initiatives scraped in parallel
+        # Each worker reuses one context and replaces it after this many pages,
+        # which bounds the memory Playwright accumulates per context
+        self.context_recycle_every = context_recycle_every
+        self.status_counts: Counter = Counter()
+
+        # Politeness limit on requests to the portal, shared by all workers
+        self.limiter = RateLimiter(requests_per_second)
+        self.http_misses = 0  # See HTTP_MISS_LIMIT
+
+        # One keep-alive HTTP session shared by every plain HTTP request of a run
+        self._http: Optional[aiohttp.ClientSession] = None
+
+        # Optional SQLite cache of scraped records, reused across runs while the
+        # consultation page is unchanged and the entry is younger than cache_max_age
+        self.cache_path = cache_path
+        self.cache_max_age = cache_max_age
+        self.cache: Optional[sqlite3.Connection] = None
+
+        # Records are streamed to these files as soon as they are scraped
+        self.output_base: Optional[str] = None
+        self._csv_file = None
+        self._csv_writer: Optional[csv.DictWriter] = None
+        self._jsonl_file = None
+
+    async def new_context(self, browser: Browser) -> BrowserContext:
+        """Create a browser context configured for scraping"""
+        context = await browser.new_context(user_agent=self.USER_AGENT)
+        await context.route("**/*", self.block_unneeded_requests)
+        return context
+
+    async def block_unneeded_requests(self, route: Route):
+        """Abort images, fonts, media and analytics; let everything else through"""
+        request = route.request
+        if (request.resource_type in self.BLOCKED_RESOURCE_TYPES
+                or urlparse(request.url).hostname in self.BLOCKED_HOSTS):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def wait_for_content(self, page: Page, selector: str, timeout: int = 15000):
+        """Wait until an element the next step reads is rendered
+
+        The portal keeps background connections open, so waiting for network
+        idle mostly runs into its timeout; the needed element is a precise signal.
+        """
+        try:
+            await page.wait_for_selector(selector, timeout=timeout)
+        except Exception as e:
+            logger.warning(f"Timed out waiting for '{selector}': {e}")
+
+    async def wait_for_page_data(self, page: Page, timeout: int = 15000):
+        """Wait until the consultation page parts read by PAGE_DATA_SCRIPT are rendered
 
-    async def wait_for_page_load(self, page: Page, timeout: int = 30000):
-        """Wait for page to be fully loaded"""
+        Sections render one after another, so the first matching element is
+        not enough: the outcome files can appear after the description list.
+        """
         try:
-            await page.wait_for_load_state("networkidle", timeout=timeout)
+            await page.wait_for_function(self.PAGE_READY_SCRIPT, timeout=timeout)
         except Exception as e:
-            logger.warning(f"Network idle timeout: {e}")
-            await page.wait_for_load_state("domcontentloaded")
+            logger.warning(f"Timed out waiting for consultation page content: {e}")
 
-    async def scrape_all_consultations(self) -> List[ConsultationData]:
-        """Main method to scrape all consultations"""
+    async def scrape_all_consultations(self) -> Counter:
+        """Main method to scrape all consultations; returns counts per scrape status"""
         async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=self.headless, slow_mo=self.slow_mo)
-            context = await browser.new_context(
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            args = (self.CHROMIUM_ARGS + self.NO_SANDBOX_ARGS) if self.no_sandbox else self.CHROMIUM_ARGS
+            browser = await p.chromium.launch(
+                headless=self.headless, slow_mo=self.slow_mo, args=args,
+                chromium_sandbox=not self.no_sandbox,
             )
-            page = await context.new_page()
+            self.open_http()
 
             try:
                 # Get all initiative URLs from search results
-                initiative_urls = await self.get_initiative_urls(page)
+                initiative_urls = await self.get_initiative_urls(browser)
                 logger.info(f"Found {len(initiative_urls)} initiatives")
 
-                # Process each initiative
+                # Process initiatives with a pool of workers sharing one queue
+                queue: asyncio.Queue = asyncio.Queue()
                 for idx, initiative_url in enumerate(initiative_urls, 1):
-                    logger.info(f"Processing {idx}/{len(initiative_urls)}: {initiative_url}")
-                    consultation_data = await self.scrape_consultation(page, initiative_url)
-                    self.results.append(consultation_data)
+                    queue.put_nowait((idx, initiative_url))
 
-                    # Small delay to be respectful
-                    await asyncio.sleep(1)
+                self.open_outputs()
+                self.open_cache()
+                await asyncio.gather(*(
+                    self._worker(browser, queue, len(initiative_urls))
+                    for _ in range(self.concurrency)
+                ))
 
             except Exception as e:
                 logger.error(f"Error in main scraping process: {e}")
             finally:
                 await browser.close()
+                await self.close_http()
+                self.close_outputs()
+                self.close_cache()
+
+        return self.status_counts
+
+    async def _worker(self, browser: Browser, queue: asyncio.Queue, total: int):
+        """Scrape initiatives from the queue until it is empty"""
+        context: Optional[BrowserContext] = None
+        pages_done = 0
+
+        while not queue.empty():
+            idx, initiative_url = queue.get_nowait()
+            logger.info(f"Processing {idx}/{total}: {initiative_url}")
+
+            validators = None
+            if self.cache is not None:
+                consultation_url = self.get_consultation_url(initiative_url)
+                validators = await self.fetch_validators(consultation_url)
+                cached = self.load_cached(initiative_url, validators)
+                if cached is not None:
+                    logger.info(f"Consultation page unchanged, using cached data: {initiative_url}")
+                    self.emit(cached)
+                    continue
+
+            # Server-rendered pages are read without the browser
+            consultation_data = await self.scrape_consultation_http(initiative_url)
+            if consultation_data is not None:
+                self.emit(consultation_data)
+                if validators:
+                    self.store_cached(initiative_url, validators, consultation_data)
+                continue
+
+            try:
+                if context is None:
+                    context = await self.new_context(browser)
+                page = await context.new_page()
+                try:
+                    consultation_data = await self.scrape_consultation(page, initiative_url)
+                finally:
+                    await page.close()
+            except Exception as e:
+                logger.error(f"Worker error on {initiative_url}: {e}")
+                # consultation_data is still None from the HTTP attempt unless
+                # the scrape finished and only closing the page failed
+                if consultation_data is None:
+                    # Record the failure so the initiative is not silently missing
+                    consultation_data = self.new_consultation_data(initiative_url)
+                    consultation_data.scrape_status = "error"
+                    consultation_data.error_message = str(e)
+                # The context may be broken; continue with a fresh one
+                await self.close_context(context)
+                context = None
+                pages_done = 0
+            else:
+                pages_done += 1
+                if pages_done >= self.context_recycle_every:
+                    await self.close_context(context)
+                    context = None
+                    pages_done = 0
+
+            self.emit(consultation_data)
+            if validators and consultation_data.scrape_status == 'success':
+                self.store_cached(initiative_url, validators, consultation_data)
+
+        await self.close_context(context)
+
+    async def close_context(self, context: Optional[BrowserContext]):
+        """Close a worker context, ignoring errors from an already broken one"""
+        if context is None:
+            return
+        try:
+            await context.close()
+        except Exception as e:
+            logger.warning(f"Error closing browser context: {e}")
+
+    def open_cache(self):
+        """Open (and create if needed) the scrape cache database"""
+        if not self.cache_path:
+            return
+        self.cache = sqlite3.connect(self.cache_path)
+        self.cache.execute(
+            "CREATE TABLE IF NOT EXISTS scrape_cache ("
+            "initiative_url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+            "cached_at TEXT NOT NULL, payload TEXT NOT NULL)"
+        )
+        self.cache.commit()
+
+    def close_cache(self):
+        """Close the scrape cache database"""
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+    async def fetch_validators(self, url: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """Return the (ETag, Last-Modified) of a page, or None if it has neither"""
+        try:
+            async with self.limiter, self._http.head(url, allow_redirects=True) as response:
+                if response.status != 200:
+                    return None
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+        except Exception as e:
+            logger.warning(f"Could not check {url} for changes: {e}")
+            return None
+
+        if not etag and not last_modified:
+            return None
+        return etag, last_modified
+
+    def load_cached(self, initiative_url: str,
+                    validators: Optional[Tuple[Optional[str], Optional[str]]]) -> Optional[ConsultationData]:
+        """Return the cached record if the page validators still match"""
+        if not validators:
+            return None
+
+        row = self.cache.execute(
+            "SELECT etag, last_modified, cached_at, payload FROM scrape_cache WHERE initiative_url = ?",
+            (initiative_url,)
+        ).fetchone()
+        if row is None or (row[0], row[1]) != validators:
+            return None
+
+        # An unreadable entry is treated as a cache miss
+        try:
+            if datetime.now() - datetime.fromisoformat(row[2]) > self.cache_max_age:
+                return None
+            payload = _loads(row[3])
+            return ConsultationData(**{key: payload[key] for key in _FIELDS if key in payload})
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry for {initiative_url}: {e}")
+            return None
+
+    def store_cached(self, initiative_url: str,
+                     validators: Tuple[Optional[str], Optional[str]], data: ConsultationData):
+        """Store a successfully scraped record with the validators it was scraped under"""
+        etag, last_modified = validators
+        self.cache.execute(
+            "INSERT OR REPLACE INTO scrape_cache VALUES (?, ?, ?, ?, ?)",
+            (initiative_url, etag, last_modified, datetime.now().isoformat(),
+             _dumps(_row(data)).decode('utf-8'))
+        )
+        self.cache.commit()
+
+    async def get_initiative_urls(self, browser: Browser) -> List[str]:
+        """Extract all initiative URLs, using the browser only if plain HTML has none"""
+        initiative_urls = await self.get_initiative_urls_http()
+        if initiative_urls:
+            return initiative_urls
+
+        logger.info("Search results need JavaScript rendering, falling back to the browser")
+        context = await self.new_context(browser)
+        try:
+            page = await context.new_page()
+            return await self.get_initiative_urls_browser(page)
+        finally:
+            await context.close()
+
+    def open_http(self):
+        """Create the shared HTTP session
+
+        Connections are kept alive and DNS lookups cached, so repeated
+        requests to the portal skip the TCP and TLS handshakes.
+        """
+        self._http = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=600),
+            headers={'User-Agent': self.USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+
+    async def close_http(self):
+        """Close the shared HTTP session"""
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    async def fetch_html(self, url: str) -> str:
+        """Fetch a page without rendering it"""
+        async with self.limiter, self._http.get(url) as response:
+            response.raise_for_status()
+            return await response.text()
+
+    async def get_initiative_urls_http(self) -> List[str]:
+        """Extract initiative URLs from the server-rendered search results
+
+        Returns an empty list when the results are rendered client-side, the
+        pagination parameter is not honoured or a request fails, so that the
+        caller can fall back to the browser.
+        """
+        initiative_urls: List[str] = []
+        seen: Set[str] = set()
+
+        try:
+            page_num = 0
+            has_next_page = False
+            while True:
+                logger.info(f"Fetching search results page {page_num} over HTTP")
+                html = await self.fetch_html(f"{self.SEARCH_URL}&page={page_num}")
+
+                added = sum(
+                    self.add_initiative_url(href, initiative_urls, seen)
+                    for href in _INITIATIVE_HREF_RE.findall(html)
+                )
+                if not added:
+                    break
 
-        return self.results
+                has_next_page = bool(_NEXT_PAGE_RE.search(html))
+                page_num += 1
 
-    async def get_initiative_urls(self, page: Page) -> List[str]:
-        """Extract all initiative URLs from the search results page"""
-        initiative_urls = []
+            # The first page links to more results but the next one added
+            # nothing: the page parameter is not supported
+            if page_num == 1 and has_next_page:
+                return []
+
+        except Exception as e:
+            logger.warning(f"Error fetching search results over HTTP: {e}")
+            return []
+
+        return initiative_urls
+
+    def add_initiative_url(self, href: Optional[str], initiative_urls: List[str], seen: Set[str]) -> bool:
+        """Normalize an initiative link and append it if new; returns True if added
+
+        seen holds the URLs already in initiative_urls, so the check is O(1).
+        """
+        if not href or '/initiatives/' not in href:
+            return False
+
+        # Convert relative to absolute URL
+        if href.startswith('/'):
+            full_url = f"https://ec.europa.eu{href}"
+        else:
+            full_url = href
+
+        # Remove the _en suffix and any query params for consistency
+        full_url = full_url.split('?')[0]
+        if full_url.endswith('_en'):
+            full_url = full_url[:-3]
+
+        # Only add unique URLs
+        if full_url in seen:
+            return False
+        seen.add(full_url)
+        initiative_urls.append(full_url)
+        return True
+
+    async def get_initiative_urls_browser(self, page: Page) -> List[str]:
+        """Extract all initiative URLs from the search results page in the browser"""
+        initiative_urls: List[str] = []
+        seen: Set[str] = set()
 
         try:
             logger.info(f"Loading search results page: {self.SEARCH_URL}")
-            await page.goto(self.SEARCH_URL, wait_until="domcontentloaded", timeout=60000)
-            await self.wait_for_page_load(page)
+            async with self.limiter:
+                await page.goto(self.SEARCH_URL, wait_until="domcontentloaded", timeout=60000)
 
             # Wait for results to load - look for initiative links
-            await page.wait_for_selector('a[href*="/initiatives/"]', timeout=30000)
+            await page.wait_for_selector(self.INITIATIVE_LINK_SELECTOR, timeout=30000)
 
             # Handle pagination if needed
             page_num = 1
             while True:
                 logger.info(f"Extracting URLs from page {page_num}")
 
-                # Extract all links to initiative pages directly
-                links = await page.query_selector_all('a[href*="/initiatives/"]')
-                logger.info(f"Found {len(links)} initiative links on page {page_num}")
+                # Extract the hrefs of all initiative links in one round-trip
+                hrefs = await page.eval_on_selector_all(
+                    self.INITIATIVE_LINK_SELECTOR, 'links => links.map(link => link.getAttribute("href"))'
+                )
+                logger.info(f"Found {len(hrefs)} initiative links on page {page_num}")
 
-                for link_element in links:
-                    href = await link_element.get_attribute('href')
-                    if href and '/initiatives/' in href:
-                        # Convert relative to absolute URL
-                        if href.startswith('/'):
-                            full_url = f"https://ec.europa.eu{href}"
-                        else:
-                            full_url = href
-
-                        # Remove the _en suffix and any query params for consistency
-                        full_url = full_url.split('?')[0]
-                        if full_url.endswith('_en'):
-                            full_url = full_url[:-3]
-
-                        # Only add unique URLs
-                        if full_url not in initiative_urls:
-                            initiative_urls.append(full_url)
+                for href in hrefs:
+                    self.add_initiative_url(href, initiative_urls, seen)
 
                 # Check if there's a next page button
                 next_button = await page.query_selector('button[aria-label*="next" i], a[aria-label*="next" i], .ecl-pagination__link--next')
@@ -143,8 +752,16 @@ class EUConsultationScraper:
                         break
 
                     try:
+                        # The results are replaced in place; wait until the
+                        # first link differs from the one on the current page
+                        first_href = hrefs[0] if hrefs else None
                         await next_button.click()
-                        await self.wait_for_page_load(page)
+                        await page.wait_for_function(
+                            """([selector, previous]) =>
+                                document.querySelector(selector)?.getAttribute('href') !== previous""",
+                            arg=[self.INITIATIVE_LINK_SELECTOR, first_href],
+                            timeout=15000,
+                        )
                         page_num += 1
                         await asyncio.sleep(2)
                     except Exception as e:
@@ -161,36 +778,14 @@ class EUConsultationScraper:
     async def scrape_consultation(self, page: Page, initiative_url: str) -> ConsultationData:
         """Scrape a single consultation"""
 
-        # Initialize with defaults
-        data = ConsultationData(
-            initiative_id="",
-            initiative_name="",
-            initiative_url=initiative_url,
-            consultation_url="",
-            topic=None,
-            consultation_period=None,
-            total_feedback=None,
-            has_summary_report=False,
-            summary_report_url=None,
-            has_contributions_zip=False,
-            contributions_zip_url=None,
-            has_documents_annexed=False,
-            documents_annexed_url=None,
-            scrape_timestamp=datetime.now().isoformat(),
-            scrape_status="pending",
-            error_message=None
-        )
+        data = self.new_consultation_data(initiative_url)
 
         try:
-            # Extract initiative ID from URL
-            id_match = re.search(r'/initiatives/(\d+)', initiative_url)
-            if id_match:
-                data.initiative_id = id_match.group(1)
-
             # Step 1: Go to initiative overview page
             logger.info(f"Loading initiative page: {initiative_url}")
-            await page.goto(initiative_url, wait_until="domcontentloaded", timeout=60000)
-            await self.wait_for_page_load(page)
+            async with self.limiter:
+                await page.goto(initiative_url, wait_until="domcontentloaded", timeout=60000)
+            await self.wait_for_content(page, 'h1, .ecl-page-header__title')
 
             # Get initiative name from the page
             try:
@@ -201,28 +796,14 @@ class EUConsultationScraper:
                 logger.warning(f"Could not extract initiative name: {e}")
 
             # Step 2: Construct public consultation URL directly
-            consultation_link = None
-            try:
-                # Direct construction is most reliable
-                base = initiative_url.rstrip('/')
-                if base.endswith('_en'):
-                    base = base[:-3]
-                consultation_link = f"{base}/public-consultation_en"
-
-            except Exception as e:
-                logger.warning(f"Error constructing consultation link: {e}")
-
-            if not consultation_link:
-                data.scrape_status = "error"
-                data.error_message = "Could not find public consultation link"
-                return data
-
+            consultation_link = self.get_consultation_url(initiative_url)
             data.consultation_url = consultation_link
 
             # Step 3: Go to public consultation page
             logger.info(f"Loading consultation page: {consultation_link}")
-            await page.goto(consultation_link, wait_until="domcontentloaded", timeout=60000)
-            await self.wait_for_page_load(page)
+            async with self.limiter:
+                await page.goto(consultation_link, wait_until="domcontentloaded", timeout=60000)
+            await self.wait_for_page_data(page)
 
             # Extract data from consultation page
             await self.extract_consultation_data(page, data)
@@ -236,163 +817,269 @@ class EUConsultationScraper:
 
         return data
 
+    def new_consultation_data(self, initiative_url: str) -> ConsultationData:
+        """Create a pending record with defaults for an initiative"""
+        data = ConsultationData(
+            initiative_id="",
+            initiative_name="",
+            initiative_url=initiative_url,
+            consultation_url="",
+            topic=None,
+            consultation_period=None,
+            total_feedback=None,
+            has_summary_report=False,
+            summary_report_url=None,
+            has_contributions_zip=False,
+            contributions_zip_url=None,
+            has_documents_annexed=False,
+            documents_annexed_url=None,
+            scrape_timestamp=datetime.now().isoformat(),
+            scrape_status="pending",
+            error_message=None
+        )
+
+        # Extract initiative ID from URL
+        id_match = _INITIATIVE_ID_RE.search(initiative_url)
+        if id_match:
+            data.initiative_id = id_match.group(1)
+
+        return data
+
+    async def scrape_consultation_http(self, initiative_url: str) -> Optional[ConsultationData]:
+        """Scrape a consultation from its server-rendered HTML, without the browser
+
+        Returns None when the pages are not fully server-rendered or a file link
+        can only be resolved by clicking it; the caller then uses the browser.
+        """
+        # Stop trying once pages keep turning out to need the browser
+        if self.http_misses >= self.HTTP_MISS_LIMIT:
+            return None
+
+        consultation_url = self.get_consultation_url(initiative_url)
+        try:
+            initiative_page = ConsultationPageParser.parse(await self.fetch_html(initiative_url))
+            consultation_page = ConsultationPageParser.parse(await self.fetch_html(consultation_url))
+        except Exception as e:
+            logger.info(f"Plain HTTP fetch failed, using the browser: {e}")
+            self.http_misses += 1
+            return None
+
+        page_data = consultation_page.page_data()
+        if (initiative_page.title is None or not consultation_page.is_complete()
+                or any(entry['href'] is not None and '/api/download/' not in entry['href'] for entry in page_data['files'])):
+            self.http_misses += 1
+            if self.http_misses == self.HTTP_MISS_LIMIT:
+                logger.info("Consultation pages need JavaScript rendering, using the browser only")
+            return None
+        self.http_misses = 0
+
+        data = self.new_consultation_data(initiative_url)
+        data.initiative_name = initiative_page.title
+        data.consultation_url = consultation_url
+        await self.apply_page_data(page_data, data, consultation_url)
+        data.scrape_status = "success"
+        return data
+
+    def get_consultation_url(self, initiative_url: str) -> str:
+        """Build the public consultation URL of an initiative (direct construction is most reliable)"""
+        base = initiative_url.rstrip('/')
+        if base.endswith('_en'):
+            base = base[:-3]
+        return f"{base}/public-consultation_en"
+
     async def extract_consultation_data(self, page: Page, data: ConsultationData):
         """Extract all required data from the consultation page"""
 
-        # Extract Topic
+        # Query the DOM once; the fields below are read from the result
         try:
-            topic_elements = await page.query_selector_all('dt.ecl-description-list__term')
-            for dt in topic_elements:
-                text = await dt.inner_text()
-                if 'topic' in text.lower():
-                    dd_handle = await dt.evaluate_handle('node => node.nextElementSibling')
-                    dd_element = dd_handle.as_element()
-                    if dd_element:
-                        topic_text = await dd_element.inner_text()
-                        if topic_text:
-                            data.topic = topic_text.strip()
-                        break
+            page_data = await page.evaluate(self.PAGE_DATA_SCRIPT)
         except Exception as e:
-            logger.warning(f"Error extracting topic: {e}")
+            logger.warning(f"Error reading consultation page: {e}")
+            return
+
+        await self.apply_page_data(page_data, data, page.url, page)
+
+    async def apply_page_data(self, page_data: Dict, data: ConsultationData, page_url: str,
+                              page: Optional[Page] = None):
+        """Fill a record from PAGE_DATA_SCRIPT output (or the same structure parsed from HTML)
+
+        Links without a usable href are resolved by clicking them, which
+        needs the browser page.
+        """
+
+        # Extract Topic
+        data.topic = page_data['topic']
 
         # Extract Consultation Period
-        try:
-            period_element = await page.query_selector('span.ecl-u-type-capitalize')
-            if period_element:
-                data.consultation_period = (await period_element.inner_text()).strip()
-        except Exception as e:
-            logger.warning(f"Error extracting consultation period: {e}")
+        data.consultation_period = page_data['period']
 
         # Extract Total Feedback
         try:
-            # Look through all h4 elements for the feedback count
-            h4_elements = await page.query_selector_all('h4')
-            for h4 in h4_elements:
-                feedback_text = await h4.inner_text()
-                if 'feedback' in feedback_text.lower() and 'received' in feedback_text.lower():
-                    # Extract number from text like "Total of valid feedback instances received: 244"
-                    match = re.search(r':\s*(\d+)', feedback_text)
-                    if match:
-                        data.total_feedback = int(match.group(1))
-                    break
+            feedback_text = page_data['feedback_text']
+            if feedback_text:
+                # Extract number from text like "Total of valid feedback instances received: 244"
+                match = _FEEDBACK_NUM_RE.search(feedback_text)
+                if match:
+                    data.total_feedback = int(match.group(1))
         except Exception as e:
             logger.warning(f"Error extracting total feedback: {e}")
 
         # Extract Consultation Outcome section data
         try:
-            # Get all h3 headings to understand the page structure
-            h3_elements = await page.query_selector_all('h3')
-            h3_texts = []
-            for h3 in h3_elements:
-                text = await h3.inner_text()
-                h3_texts.append(text.strip())
-
-            has_summary_section = "Summary report" in h3_texts
-            has_contributions_section = "Contributions to the consultation" in h3_texts
-
-            # Get all files on the page
-            file_elements = await page.query_selector_all('ecl-file')
-
-            # Storage for captured download URLs
-            captured_urls = {}
-
-            # Set up request interceptor to capture download URLs
-            def handle_request(request):
-                if '/api/download/' in request.url:
-                    captured_urls[request.url] = request.url
-
-            page.on("request", handle_request)
-
-            for idx, file_elem in enumerate(file_elements):
-                title_elem = await file_elem.query_selector('.ecl-file__title')
-                if title_elem:
-                    title = (await title_elem.inner_text()).strip()
-                    title_lower = title.lower()
-
-                    # Get download link and click it to trigger the URL
-                    download_link = await file_elem.query_selector('a')
-                    if download_link:
-                        try:
-                            # Click to trigger the download request (but don't actually download)
-                            await download_link.click(timeout=3000)
-                            await asyncio.sleep(0.5)  # Give time for request to be captured
-
-                            # Find the URL that was just captured
-                            if captured_urls:
-                                latest_url = list(captured_urls.values())[-1]
-
-                                # Determine file type based on context and title
-                                if has_contributions_section and 'contribution' in title_lower and 'annex' not in title_lower:
-                                    # This is the main contributions ZIP
-                                    data.has_contributions_zip = True
-                                    data.contributions_zip_url = latest_url
-
-                                elif has_contributions_section and 'document' in title_lower and 'annex' in title_lower:
-                                    # This is documents annexed
-                                    data.has_documents_annexed = True
-                                    data.documents_annexed_url = latest_url
-
-                                elif has_summary_section:
-                                    # This is a summary report
-                                    data.has_summary_report = True
-                                    data.summary_report_url = latest_url
-
-                        except Exception as click_error:
-                            logger.warning(f"Error clicking download link for '{title}': {click_error}")
-
-            # Remove the event listener
-            page.remove_listener("request", handle_request)
+            has_summary_section = page_data['has_summary_section']
+            has_contributions_section = page_data['has_contributions_section']
+
+            for entry in page_data['files']:
+                title = entry['title']
+                if not title:
+                    continue
+
+                # Determine file type based on context and title
+                title_lower = title.lower()
+                if has_contributions_section and 'contribution' in title_lower and 'annex' not in title_lower:
+                    # This is the main contributions ZIP
+                    kind = 'contributions'
+                elif has_contributions_section and 'document' in title_lower and 'annex' in title_lower:
+                    # This is documents annexed
+                    kind = 'annexed'
+                elif has_summary_section:
+                    # This is a summary report
+                    kind = 'summary'
+                else:
+                    # Nothing would be recorded, so do not resolve the link
+                    continue
+
+                href = entry['href']
+                if href is None:
+                    continue
+                if '/api/download/' in href:
+                    download_url = urljoin(page_url, href)
+                elif page is not None:
+                    # Link has no usable href; fall back to clicking it
+                    download_url = await self.capture_download_url(page, entry['index'])
+                else:
+                    download_url = None
+                if not download_url:
+                    continue
+
+                if kind == 'contributions':
+                    data.has_contributions_zip = True
+                    data.contributions_zip_url = download_url
+                elif kind == 'annexed':
+                    data.has_documents_annexed = True
+                    data.documents_annexed_url = download_url
+                else:
+                    data.has_summary_report = True
+                    data.summary_report_url = download_url
 
         except Exception as e:
             logger.warning(f"Error extracting consultation outcome data: {e}")
 
+    async def capture_download_url(self, page: Page, index: int) -> Optional[str]:
+        """Click the link of the index-th file and return the download URL it requests"""
+        try:
+            async with page.expect_request(lambda request: '/api/download/' in request.url,
+                                           timeout=3000) as request_info:
+                await page.locator('ecl-file').nth(index).locator('a').first.click(timeout=3000)
+            return (await request_info.value).url
+        except Exception as e:
+            logger.warning(f"Error capturing download link for file {index}: {e}")
+            return None
+
+    def open_outputs(self):
+        """Open the CSV and JSON Lines files that records are streamed to"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.output_base = f'{self.OUTPUT_PREFIX}_{timestamp}'
+
+        self._csv_file = open(f'{self.output_base}.csv', 'w', newline='', encoding='utf-8')
+        self._csv_writer = csv.DictWriter(self._csv_file, fieldnames=_FIELDS)
+        self._csv_writer.writeheader()
+        self._jsonl_file = open(f'{self.output_base}.jsonl', 'wb')
+
+    def emit(self, data: ConsultationData):
+        """Write one scraped record to the output files
+
+        Files are flushed per record so a crash keeps everything scraped so far.
+        """
+        row = _row(data)
+        self._csv_writer.writerow(row)
+        self._csv_file.flush()
+        self._jsonl_file.write(_dumps(row) + b'\n')
+        self._jsonl_file.flush()
+        self.status_counts[data.scrape_status] += 1
+
+    def close_outputs(self):
+        """Close the streamed output files (safe to call more than once)"""
+        for f in (self._csv_file, self._jsonl_file):
+            if f is not None:
+                f.close()
+        self._csv_file = self._csv_writer = self._jsonl_file = None
+
     def save_results(self, output_format: str = 'both'):
-        """Save results to CSV and/or JSON"""
+        """Finish the streamed output as CSV and/or JSON"""
 
-        if not self.results:
+        self.close_outputs()
+        if self.output_base is None:
             logger.warning("No results to save")
             return
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        csv_filename = f'{self.output_base}.csv'
+        jsonl_filename = f'{self.output_base}.jsonl'
+
+        if not self.status_counts:
+            logger.warning("No results to save")
+            os.remove(csv_filename)
+            os.remove(jsonl_filename)
+            return
 
-        # Save as CSV
+        # CSV is already complete
         if output_format in ['csv', 'both']:
-            csv_filename = f'eu_consultations_2025_{timestamp}.csv'
-            with open(csv_filename, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=asdict(self.results[0]).keys())
-                writer.writeheader()
-                for result in self.results:
-                    writer.writerow(asdict(result))
             logger.info(f"Results saved to {csv_filename}")
+        else:
+            os.remove(csv_filename)
 
-        # Save as JSON
+        # Save as JSON, converting the JSON Lines file one record at a time
+        # into the same layout json.dump(..., indent=2) produces. JSON strings
+        # never contain raw newlines, so indenting every line is safe
         if output_format in ['json', 'both']:
-            json_filename = f'eu_consultations_2025_{timestamp}.json'
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump([asdict(r) for r in self.results], f, indent=2, ensure_ascii=False)
+            json_filename = f'{self.output_base}.json'
+            with open(jsonl_filename, 'rb') as src, open(json_filename, 'wb') as dst:
+                dst.write(b'[')
+                for idx, line in enumerate(src):
+                    record = _dumps(_loads(line), indent=True)
+                    dst.write(b',\n  ' if idx else b'\n  ')
+                    dst.write(record.replace(b'\n', b'\n  '))
+                dst.write(b'\n]')
             logger.info(f"Results saved to {json_filename}")
 
+        os.remove(jsonl_filename)
+
 
 async def main():
     """Main execution function"""
-    scraper = EUConsultationScraper(headless=True, slow_mo=500)
+    # The portal's validators do not always change when the data does, so
+    # reusing cached records is opt-in: pass --cache to enable it
+    cache_path = EUConsultationScraper.CACHE_PATH if '--cache' in sys.argv[1:] else None
+    # Pass --no-sandbox where Chromium's sandbox cannot start, e.g. as root in a container
+    no_sandbox = '--no-sandbox' in sys.argv[1:]
+    scraper = EUConsultationScraper(headless=True, cache_path=cache_path, no_sandbox=no_sandbox)
 
     logger.info("Starting EU Consultations Scraper for 2025")
-    results = await scraper.scrape_all_consultations()
+    status_counts = await scraper.scrape_all_consultations()
 
-    logger.info(f"Scraping completed. Total consultations processed: {len(results)}")
+    logger.info(f"Scraping completed. Total consultations processed: {sum(status_counts.values())}")
 
     # Print summary
-    success_count = sum(1 for r in results if r.scrape_status == 'success')
-    error_count = sum(1 for r in results if r.scrape_status == 'error')
-
-    logger.info(f"Successful: {success_count}, Errors: {error_count}")
+    logger.info(f"Successful: {status_counts['success']}, Errors: {status_counts['error']}")
 
     # Save results
     scraper.save_results(output_format='both')
 
-    return results
+    return status_counts
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())